@@ -0,0 +1,22 @@
+# compile_kernels.py
+# Builds syntx_kernels, an ahead-of-time compiled copy of the scanner's
+# signal kernel, so the scanner starts without waiting on numba's JIT.
+# Needs numba (requirements-numba.txt):  python compile_kernels.py
+# The build carries kernel_tag(); the scanner ignores it once _signal_stats
+# or KERNEL_SIG change, until it is rebuilt.
+import os
+from numba.pycc import CC
+from syntx_scanner import KERNEL_SIG, _signal_stats, kernel_tag
+
+TAG = kernel_tag()
+
+cc = CC('syntx_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+cc.export('signal_kernel', KERNEL_SIG)(_signal_stats)
+
+@cc.export('kernel_tag', 'i8()')
+def _kernel_tag():
+    return TAG
+
+if __name__ == "__main__":
+    cc.compile()
@@ -1,20 +1,19 @@
 # discover_syntx.py
 import MetaTrader5 as mt5
-import re, sys
+import sys
+from syntx_symbols import DISCOVER_RE
 
 if not mt5.initialize():
     print("MT5 initialize failed:", mt5.last_error())
     sys.exit(1)
 
 symbols = mt5.symbols_get()
-pattern = re.compile(r'(vol|pain|gain|synt|fx|flip|break|trend|switch|sfx)', re.IGNORECASE)
-
+search = DISCOVER_RE.search
 candidates = []
 for s in symbols:
     try:
         name = s.name
-        desc = getattr(s, "description", "") or ""
-        if pattern.search(name) or pattern.search(desc):
+        if search(name) or search(getattr(s, "description", "") or ""):
             candidates.append(name)
     except Exception:
         continue
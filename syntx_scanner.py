@@ -1,10 +1,17 @@
 # weltrade_syntx_scanner.py
-import time, os
-from datetime import datetime
+import time, os, queue, threading, argparse, inspect, zlib
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 import MetaTrader5 as mt5
-import pandas as pd
 import numpy as np
 import requests
+from syntx_symbols import SYNTX_RE, DISCOVER_RE
+try:
+    from numba import njit
+except ImportError:  # numba is optional (requirements-numba.txt); use bottleneck's C kernels
+    njit = None
+    import bottleneck as bn
 
 # ================== CONFIG ==================
 MT5_PATH = None  # Optional MT5 terminal path
@@ -12,6 +19,7 @@ TIMEFRAME = mt5.TIMEFRAME_M1
 BARS = 300
 MA_FAST = 5
 MA_SLOW = 15
+MIN_BARS = MA_SLOW + 5  # history needed before a symbol is scored
 LOOP_SLEEP = 1.0
 SPIKE_MULTIPLIER = 2.0
 MIN_SPIKE_PCT = 0.0005
@@ -20,8 +28,17 @@ RISK_PCT = 0.005  # 0.5% SL/TP
 # Telegram alerts (optional)
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT = os.getenv("TELEGRAM_CHAT_ID")
+_TG_URL = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
+ALERT_FLUSH_TIMEOUT = 5.0  # seconds to keep sending queued alerts on exit
 # ===========================================
 
+# get_bars is an MT5 IPC round-trip, so fan it out across symbols;
+# Telegram posts are queued to their own thread so they never hold up a scan.
+EXECUTOR = ThreadPoolExecutor(max_workers=16)
+ALERT_Q = queue.Queue()
+# One keep-alive connection to Telegram instead of a TLS handshake per alert
+SESSION = requests.Session()
+
 # ----- MT5 Initialization -----
 def init_mt5():
     if MT5_PATH:
@@ -33,14 +50,28 @@ def init_mt5():
     print("MT5 initialized.")
 
 # ----- Auto-detect Weltrade Synthetics -----
-def detect_syntx_symbols():
-    all_symbols = mt5.symbols_get()
-    syntx_keywords = ["GAIN","PAIN","FX","SFX","VOL","DVOL","BDRY","GANX"]
+# symbol -> (digits, point, trade_tick_size), filled once at detection
+SYMBOL_META = {}
+
+def detect_syntx_symbols(mode="keyword", names=()):
+    # mode: "keyword" (SYNTX_RE), "regex" (DISCOVER_RE) or "explicit" (names)
+    if mode == "explicit":
+        found = []
+        for n in names:
+            info = mt5.symbol_info(n)
+            if info is None:
+                print("Unknown symbol:", n)
+            else:
+                found.append(info)
+    else:
+        pattern = SYNTX_RE if mode == "keyword" else DISCOVER_RE
+        found = [s for s in mt5.symbols_get()
+                 if pattern.search(s.name) or pattern.search(getattr(s, "description", "") or "")]
     available = []
-    for s in all_symbols:
-        if any(k in s.name.upper() for k in syntx_keywords):
-            mt5.symbol_select(s.name, True)
-            available.append(s.name)
+    for s in found:
+        mt5.symbol_select(s.name, True)
+        SYMBOL_META[s.name] = (s.digits, s.point, s.trade_tick_size)
+        available.append(s.name)
     print("Monitoring Weltrade Synthetics:", available)
     return available
 
@@ -48,42 +79,176 @@ def detect_syntx_symbols():
 def get_bars(symbol, n=BARS, timeframe=TIMEFRAME):
     rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, n)
     if rates is None or len(rates) == 0:
-        return pd.DataFrame()
-    df = pd.DataFrame(rates)
-    df['time'] = pd.to_datetime(df['time'], unit='s')
-    return df
+        return None
+    return rates
 
-# ----- Compute signals -----
-def compute_signal(df):
-    if df.shape[0] < MA_SLOW + 5:
+# ----- Rolling close buffer -----
+class ScanBuffer:
+    """Closes of every scanned symbol, one right-aligned row per symbol."""
+    __slots__ = ('close', 'count', 'last_ts', 'fresh', 'stats')
+
+    def __init__(self, n_symbols, bars=BARS):
+        # float64: prices carry more significant digits than float32 holds,
+        # and near-tie MA crossovers flip on the rounding
+        self.close = np.zeros((n_symbols, bars), dtype=np.float64)
+        self.count = np.zeros(n_symbols, dtype=np.int64)    # valid bars per row
+        self.last_ts = np.zeros(n_symbols, dtype=np.int64)  # 0 until warmed up
+        self.fresh = np.zeros(n_symbols, dtype=bool)        # row changed this loop
+        self.stats = np.zeros((6, n_symbols), dtype=np.float64)
+
+    def reset(self, i, rates):
+        k = min(len(rates), self.close.shape[1])
+        self.close[i, -k:] = rates['close'][-k:]
+        self.count[i] = k
+        self.last_ts[i] = rates['time'][-1]
+        self.fresh[i] = True
+
+    def update(self, i, rates):
+        # rates holds the last closed bar and the forming one; False means we
+        # lost track (missed bars) and the row has to be re-fetched.
+        if rates is None or len(rates) < 2:
+            return False
+        times = rates['time']; closes = rates['close']; row = self.close[i]
+        if times[-1] == self.last_ts[i]:
+            self.fresh[i] = row[-1] != closes[-1]
+            row[-1] = closes[-1]
+        elif times[-2] == self.last_ts[i]:
+            row[:-1] = row[1:]
+            row[-2] = closes[-2]
+            row[-1] = closes[-1]
+            self.count[i] = min(self.count[i] + 1, row.shape[0])
+            self.last_ts[i] = times[-1]
+            self.fresh[i] = True
+        else:
+            return False
+        return True
+
+def refresh(buf, i, symbol):
+    # After warm-up only the two newest bars are pulled from MT5
+    if buf.last_ts[i] and buf.update(i, get_bars(symbol, n=2)):
+        return
+    rates = get_bars(symbol)
+    if rates is None:
+        buf.fresh[i] = False
+        return
+    buf.reset(i, rates)
+
+# ----- Signal kernel -----
+def _signal_stats(close, count, ma_fast, ma_slow, out):
+    # Per row: last/prev fast MA, last/prev slow MA, last return, return std
+    n = close.shape[1]
+    for r in range(close.shape[0]):
+        if count[r] < ma_slow + 2:
+            continue
+        row = close[r]
+        # Only the last two values of each moving average are needed
+        fast_last = 0.0; fast_prev = 0.0
+        for i in range(n - ma_fast, n): fast_last += row[i]
+        for i in range(n - ma_fast - 1, n - 1): fast_prev += row[i]
+        slow_last = 0.0; slow_prev = 0.0
+        for i in range(n - ma_slow, n): slow_last += row[i]
+        for i in range(n - ma_slow - 1, n - 1): slow_prev += row[i]
+
+        # Sample std of bar-to-bar returns in one pass (Welford)
+        k = 0; mean = 0.0; m2 = 0.0
+        for i in range(n - count[r] + 1, n):
+            pct = row[i] / row[i - 1] - 1.0
+            k += 1
+            delta = pct - mean
+            mean += delta / k
+            m2 += delta * (pct - mean)
+
+        out[0, r] = fast_last / ma_fast
+        out[1, r] = fast_prev / ma_fast
+        out[2, r] = slow_last / ma_slow
+        out[3, r] = slow_prev / ma_slow
+        out[4, r] = row[n - 1] / row[n - 2] - 1.0
+        out[5, r] = np.sqrt(m2 / (k - 1))
+
+def _signal_stats_bn(close, count, ma_fast, ma_slow, out):
+    # Same statistics as _signal_stats, vectorized over rows with bottleneck
+    n = close.shape[1]
+    fast = bn.move_mean(close[:, -ma_fast - 1:], ma_fast, axis=1)
+    slow = bn.move_mean(close[:, -ma_slow - 1:], ma_slow, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = close[:, 1:] / close[:, :-1] - 1.0
+    # Returns reaching into the empty left part of short rows don't count
+    pct[np.arange(1, n) < (n - count + 1)[:, None]] = np.nan
+    out[0] = fast[:, -1]; out[1] = fast[:, -2]
+    out[2] = slow[:, -1]; out[3] = slow[:, -2]
+    out[4] = pct[:, -1]
+    out[5] = bn.nanstd(pct, axis=1, ddof=1)
+
+# Signature of the AOT export; the first argument must match ScanBuffer.close
+KERNEL_SIG = 'void(f8[:,:], i8[:], i8, i8, f8[:,:])'
+
+def kernel_tag():
+    # Fingerprint of the kernel source and signature; compile_kernels.py bakes
+    # it into the build so a stale extension is never called
+    return zlib.crc32((inspect.getsource(_signal_stats) + KERNEL_SIG).encode())
+
+def _load_aot_kernel():
+    try:
+        import syntx_kernels
+    except ImportError:
         return None
-    df = df.copy()
-    df['ma_fast'] = df['close'].rolling(MA_FAST).mean()
-    df['ma_slow'] = df['close'].rolling(MA_SLOW).mean()
-    df['pct'] = df['close'].pct_change()
-    last = df.iloc[-1]; prev = df.iloc[-2]
-
-    vol = df['pct'].std()
-    spike_threshold = max(MIN_SPIKE_PCT, SPIKE_MULTIPLIER * vol)
-
-    buy = (last['ma_fast'] > last['ma_slow']) and (prev['ma_fast'] <= prev['ma_slow'])
-    sell = (last['ma_fast'] < last['ma_slow']) and (prev['ma_fast'] >= prev['ma_slow'])
-    last_pct = last['pct'] if not np.isnan(last['pct']) else 0.0
-
-    if abs(last_pct) >= spike_threshold:
-        return {"type":"SPIKE_UP" if last_pct>0 else "SPIKE_DOWN",
-                "price":float(last['close']),
-                "pct":float(last_pct),
-                "time":last['time']}
-    if buy:
-        return {"type":"BUY", "price":float(last['close']), "time":last['time']}
-    if sell:
-        return {"type":"SELL", "price":float(last['close']), "time":last['time']}
-    return None
+    try:
+        fresh = syntx_kernels.kernel_tag() == kernel_tag()
+    except (AttributeError, OSError):
+        fresh = False
+    if not fresh:
+        print("Ignoring stale syntx_kernels build; re-run compile_kernels.py")
+        return None
+    return syntx_kernels.signal_kernel
+
+# Prefer the ahead-of-time build from compile_kernels.py, then numba's JIT
+_signal_kernel = _load_aot_kernel()
+if _signal_kernel is None:
+    if njit is not None:
+        _signal_kernel = njit(cache=True, fastmath=True)(_signal_stats)
+    else:
+        _signal_kernel = _signal_stats_bn
+
+def warm_kernels():
+    # Run the kernel once on a dummy buffer so any JIT compile (or cache load)
+    # happens at startup rather than on the first live scan
+    buf = ScanBuffer(1, MIN_BARS)
+    buf.close[:] = 1.0
+    buf.count[:] = MIN_BARS
+    _signal_kernel(buf.close, buf.count, MA_FAST, MA_SLOW, buf.stats)
+
+# ----- Compute signals -----
+SIGNAL_TYPES = {1: "BUY", -1: "SELL", 2: "SPIKE_UP", -2: "SPIKE_DOWN"}
+
+def compute_signals(buf):
+    """Return (row, signal) pairs for the rows of buf that changed this loop."""
+    # Rows whose newest bar did not change keep their last result
+    live = buf.fresh & (buf.count >= MIN_BARS)
+    if not live.any():
+        return []
+    _signal_kernel(buf.close, buf.count, MA_FAST, MA_SLOW, buf.stats)
+    fast_last, fast_prev, slow_last, slow_prev, last_pct, vol = buf.stats
+    spike_threshold = np.maximum(MIN_SPIKE_PCT, SPIKE_MULTIPLIER * vol)
+    spike = live & (np.abs(last_pct) >= spike_threshold)
+    buy = live & (fast_last > slow_last) & (fast_prev <= slow_prev)
+    sell = live & (fast_last < slow_last) & (fast_prev >= slow_prev)
+    # One code per row, spikes taking precedence over crossovers
+    kind = np.select([spike & (last_pct > 0), spike, buy, sell], [2, -2, 1, -1], 0)
+
+    # Python only touches rows that actually produced a signal
+    signals = []
+    for i in np.flatnonzero(kind):
+        code = kind[i]
+        sig = {"type":SIGNAL_TYPES[code], "price":float(buf.close[i, -1])}
+        if abs(code) == 2:
+            sig["pct"] = float(last_pct[i])
+        sig["time"] = int(buf.last_ts[i])
+        signals.append((i, sig))
+    return signals
 
 # ----- Calculate Stop-Loss & Take-Profit -----
-def calculate_sl_tp(signal, df):
-    entry = df['close'].iloc[-1]
+def calculate_sl_tp(symbol, signal):
+    entry = signal['price']
     if signal['type'] in ['BUY','SPIKE_UP']:
         sl = entry * (1 - RISK_PCT)
         tp = entry * (1 + RISK_PCT*2)
@@ -92,62 +257,103 @@ def calculate_sl_tp(signal, df):
         tp = entry * (1 - RISK_PCT*2)
     else:
         sl, tp = entry, entry
-    return round(sl,5), round(tp,5)
+    digits = SYMBOL_META[symbol][0]
+    return round(sl,digits), round(tp,digits)
 
 # ----- Format the signal nicely -----
-def format_signal(symbol, sig, df):
-    sl, tp = calculate_sl_tp(sig, df)
+def format_signal(symbol, sig):
+    sl, tp = calculate_sl_tp(symbol, sig)
     text = f"🔹 {symbol} - {sig['type']}\n"
     text += f"   ⬆️ Entry: {sig['price']}\n"
     text += f"   🛑 Stop-Loss: {sl}\n"
     text += f"   🎯 Take-Profit: {tp}\n"
     if 'pct' in sig:
         text += f"   📊 Change%: {sig['pct']*100:.2f}%\n"
-    text += f"   ⏱ Time: {sig['time']}\n"
+    # MT5 bar times are epoch seconds in server time; show them unshifted
+    stamp = datetime.fromtimestamp(sig['time'], timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    text += f"   ⏱ Time: {stamp}\n"
     return text
 
 # ----- Telegram alert -----
 def send_telegram(text):
     if not TELEGRAM_TOKEN or not TELEGRAM_CHAT:
         return False
-    url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
     try:
-        r = requests.post(url, json={"chat_id":TELEGRAM_CHAT,"text":text}, timeout=10)
+        r = SESSION.post(_TG_URL, json={"chat_id":TELEGRAM_CHAT,"text":text}, timeout=10)
         return r.status_code == 200
     except Exception as e:
         print("Telegram error:", e)
         return False
 
+def _tg_worker():
+    while True:
+        text = ALERT_Q.get()
+        if text is None:
+            return
+        send_telegram(text)
+
+# ----- Command line -----
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Weltrade SyntX signal scanner")
+    parser.add_argument("--mode", choices=["keyword", "regex", "explicit"], default="keyword",
+                        help="how to pick symbols: keyword list, wider discovery regex, or --symbols")
+    parser.add_argument("--symbols", nargs="+", default=[],
+                        help="symbols to scan with --mode explicit")
+    args = parser.parse_args(argv)
+    if args.mode == "explicit" and not args.symbols:
+        parser.error("--mode explicit needs --symbols")
+    return args
+
 # ----- Main loop -----
-def main():
+def main(argv=None):
+    args = parse_args(argv)
     init_mt5()
-    symbols = detect_syntx_symbols()
+    symbols = detect_syntx_symbols(args.mode, args.symbols)
     if not symbols:
         print("No Weltrade Synthetics found. Check Market Watch.")
         mt5.shutdown()
         return
 
+    warm_kernels()
+    tg_thread = threading.Thread(target=_tg_worker, daemon=True)
+    tg_thread.start()
     seen = {s: None for s in symbols}
+    buf = ScanBuffer(len(symbols))
+    # Absolute deadlines on the monotonic clock, so cadence doesn't drift
+    next_tick = time.monotonic() + LOOP_SLEEP
     try:
         while True:
-            loop_start = time.time()
-            for s in symbols:
-                df = get_bars(s)
-                if df.empty: continue
-                sig = compute_signal(df)
-                if sig:
-                    stamp = str(sig.get("time"))
-                    if seen[s] == stamp: continue
-                    seen[s] = stamp
-                    formatted = format_signal(s, sig, df)
-                    print(formatted)
-                    send_telegram(formatted)
-            elapsed = time.time() - loop_start
-            time.sleep(max(LOOP_SLEEP - elapsed, 0.1))
+            # Each worker fills its own row; list() waits for all of them
+            list(EXECUTOR.map(refresh, repeat(buf), range(len(symbols)), symbols))
+            for i, sig in compute_signals(buf):
+                s = symbols[i]
+                stamp = sig["time"]  # int epoch seconds
+                if seen[s] == stamp: continue
+                seen[s] = stamp
+                formatted = format_signal(s, sig)
+                print(formatted)
+                ALERT_Q.put_nowait(formatted)
+            now = time.monotonic()
+            sleep_for = next_tick - now
+            if sleep_for > 0:
+                next_tick += LOOP_SLEEP
+                time.sleep(sleep_for)
+            else:
+                # Overran the slot: start again from now instead of bursting
+                next_tick = now + LOOP_SLEEP
     except KeyboardInterrupt:
         print("Scanner stopped by user.")
     finally:
+        # Let in-flight MT5 calls finish before the terminal is torn down
+        EXECUTOR.shutdown(wait=True, cancel_futures=True)
         mt5.shutdown()
+        # Give queued alerts a short grace period; whatever is still pending
+        # after that dies with the daemon thread.
+        ALERT_Q.put(None)
+        try:
+            tg_thread.join(timeout=ALERT_FLUSH_TIMEOUT)
+        finally:
+            SESSION.close()
 
 if __name__ == "__main__":
     main()
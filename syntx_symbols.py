@@ -0,0 +1,9 @@
+# syntx_symbols.py
+# Name patterns for Weltrade SyntX instruments, shared by the scanner and
+# discover_syntx.py. Kept free of MT5/numba imports so either can load it cheaply.
+import re
+
+SYNTX_KEYWORDS = ["GAIN","PAIN","FX","SFX","VOL","DVOL","BDRY","GANX"]
+SYNTX_RE = re.compile('|'.join(map(re.escape, SYNTX_KEYWORDS)), re.IGNORECASE)
+# Wider net for brokers that name synthetics differently
+DISCOVER_RE = re.compile(r'(vol|pain|gain|synt|fx|flip|break|trend|switch|sfx)', re.IGNORECASE)